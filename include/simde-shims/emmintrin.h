@@ -0,0 +1,10 @@
+/* Shim redirecting x86 SSE2 intrinsics to SIMDe on other architectures. */
+#ifndef PYOPAL_SIMDE_SHIM_EMMINTRIN_H
+#define PYOPAL_SIMDE_SHIM_EMMINTRIN_H
+
+#ifndef SIMDE_ENABLE_NATIVE_ALIASES
+#define SIMDE_ENABLE_NATIVE_ALIASES
+#endif
+#include <simde/x86/sse2.h>
+
+#endif
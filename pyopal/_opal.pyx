@@ -33,6 +33,8 @@ cimport opal
 cimport opal.score_matrix
 from opal cimport OpalSearchResult
 
+if SIMDE_BUILD_SUPPORT:
+    from pyopal._opal_simde cimport opalSearchDatabaseSIMDE
 if NEON_BUILD_SUPPORT:
     from pyopal._opal_neon cimport opalSearchDatabaseNEON
 if SSE2_BUILD_SUPPORT:
@@ -104,15 +106,17 @@ cdef dict _OPAL_ALIGNMENT_OPERATION = {
 
 import archspec.cpu
 
-_HOST_CPU             = archspec.cpu.host()
-_SSE2_BUILD_SUPPORT   = SSE2_BUILD_SUPPORT
-_SSE4_BUILD_SUPPORT   = SSE4_BUILD_SUPPORT
-_AVX2_BUILD_SUPPORT   = AVX2_BUILD_SUPPORT
-_NEON_BUILD_SUPPORT   = NEON_BUILD_SUPPORT
-_SSE2_RUNTIME_SUPPORT = SSE2_BUILD_SUPPORT and "sse2" in _HOST_CPU.features
-_SSE4_RUNTIME_SUPPORT = SSE4_BUILD_SUPPORT and "sse4_1" in _HOST_CPU.features
-_AVX2_RUNTIME_SUPPORT = AVX2_BUILD_SUPPORT and "avx2" in _HOST_CPU.features
-_NEON_RUNTIME_SUPPORT = NEON_BUILD_SUPPORT and "neon" in _HOST_CPU.features
+_HOST_CPU               = archspec.cpu.host()
+_SSE2_BUILD_SUPPORT     = SSE2_BUILD_SUPPORT
+_SSE4_BUILD_SUPPORT     = SSE4_BUILD_SUPPORT
+_AVX2_BUILD_SUPPORT     = AVX2_BUILD_SUPPORT
+_NEON_BUILD_SUPPORT     = NEON_BUILD_SUPPORT
+_SIMDE_BUILD_SUPPORT    = SIMDE_BUILD_SUPPORT
+_SSE2_RUNTIME_SUPPORT   = SSE2_BUILD_SUPPORT and "sse2" in _HOST_CPU.features
+_SSE4_RUNTIME_SUPPORT   = SSE4_BUILD_SUPPORT and "sse4_1" in _HOST_CPU.features
+_AVX2_RUNTIME_SUPPORT   = AVX2_BUILD_SUPPORT and "avx2" in _HOST_CPU.features
+_NEON_RUNTIME_SUPPORT   = NEON_BUILD_SUPPORT and "neon" in _HOST_CPU.features
+_SIMDE_RUNTIME_SUPPORT  = SIMDE_BUILD_SUPPORT
 
 # NOTE(@althonos): NEON is always supported on Aarch64 so we should only check
 #                  that the extension was built with NEON support.
@@ -735,6 +739,8 @@ cdef class Database:
         self.extend(sequences)
 
         # Select the best available SIMD backend
+        if SIMDE_BUILD_SUPPORT and _SIMDE_RUNTIME_SUPPORT:
+            self._search = opalSearchDatabaseSIMDE
         if SSE2_BUILD_SUPPORT and _SSE2_RUNTIME_SUPPORT:
             self._search = opalSearchDatabaseSSE2
         if SSE4_BUILD_SUPPORT and _SSE4_RUNTIME_SUPPORT:
@@ -1,18 +1,24 @@
+import concurrent.futures
 import configparser
+import copy
 import functools
 import glob
 import itertools
 import io
+import json
 import multiprocessing.pool
 import os
 import platform
 import re
 import setuptools
 import setuptools.extension
+import shutil
 import subprocess
 import sys
+import sysconfig
+import threading
 from distutils.command.clean import clean as _clean
-from distutils.errors import CompileError
+from distutils.errors import CompileError, DistutilsOptionError, LinkError
 from setuptools.command.build_ext import build_ext as _build_ext
 from setuptools.command.sdist import sdist as _sdist
 from setuptools.extension import Library
@@ -62,15 +68,26 @@ elif SYSTEM.startswith(("Windows", "MSYS", "MINGW", "CYGWIN")):
 else:
     TARGET_SYSTEM = None
 
-# --- Utils ------------------------------------------------------------------
-
-_HEADER_PATTERN = re.compile("^@@ -(\d+),?(\d+)? \+(\d+),?(\d+)? @@$")
+# SIMD backends of Opal, as `suffix: (feature, define, target CPUs)`
+_SIMD_VARIANTS = {
+    "neon": ("NEON", "__ARM_NEON", ("arm", "aarch64")),
+    "sse2": ("SSE2", "__SSE2__", ("x86",)),
+    "sse4": ("SSE4", "__SSE4_1__", ("x86",)),
+    "avx2": ("AVX2", "__AVX2__", ("x86",)),
+}
 
+# --- Utils ------------------------------------------------------------------
 
 def _eprint(*args, **kwargs):
     print(*args, **kwargs, file=sys.stderr)
 
 
+def _is_launcher(executable):
+    # detect compiler launchers such as `ccache` in a compiler command
+    name = os.path.splitext(os.path.basename(executable))[0]
+    return name in {"ccache", "sccache"}
+
+
 def _patch_osx_compiler(compiler):
     # On newer OSX, Python has been compiled as a universal binary, so
     # it will attempt to pass universal binary flags when building the
@@ -134,6 +151,40 @@ class build_ext(_build_ext):
             None,
             "Force compiling the extension without NEON instructions",
         ),
+        (
+            "disable-simde",
+            None,
+            "Force compiling the extension without the SIMDe fallback",
+        ),
+        (
+            "prefer-vector-width=",
+            None,
+            "Preferred vector width (256 or 512) for code tuned with "
+            "--march-native on x86 CPUs [default: 256]",
+        ),
+        (
+            "disable-lto",
+            None,
+            "Force compiling the extension without link-time optimization",
+        ),
+        (
+            "march-native",
+            None,
+            "Tune the extension for the host CPU (implies building only the "
+            "SIMD backends supported by the host)",
+        ),
+        (
+            "pgo-generate",
+            None,
+            "Instrument the extension to record a profile for "
+            "profile-guided optimization",
+        ),
+        (
+            "pgo-use=",
+            None,
+            "Optimize the extension using the profile recorded in the "
+            "given directory",
+        ),
     ]
 
     def initialize_options(self):
@@ -142,18 +193,40 @@ class build_ext(_build_ext):
         self.disable_sse2 = False
         self.disable_sse4 = False
         self.disable_neon = False
+        self.disable_simde = False
+        self.prefer_vector_width = None
+        self.disable_lto = False
+        self.march_native = False
+        self.pgo_generate = False
+        self.pgo_use = None
 
     def finalize_options(self):
         _build_ext.finalize_options(self)
+        # check the preferred vector width for natively tuned code
+        if self.prefer_vector_width is None:
+            self.prefer_vector_width = 256
+        else:
+            try:
+                self.prefer_vector_width = int(self.prefer_vector_width)
+            except ValueError:
+                self.prefer_vector_width = None
+        if self.prefer_vector_width not in {256, 512}:
+            raise DistutilsOptionError("--prefer-vector-width must be either 256 or 512")
+        # check profile-guided optimization options
+        if self.pgo_generate and self.pgo_use:
+            raise DistutilsOptionError("cannot use both --pgo-generate and --pgo-use")
+        if self.pgo_use is not None:
+            self.pgo_use = os.path.abspath(self.pgo_use)
         # record SIMD-specific options
-        self._simd_supported = dict(AVX2=False, SSE2=False, NEON=False, SSE4=False)
-        self._simd_defines = dict(AVX2=[], SSE2=[], NEON=[], SSE4=[])
-        self._simd_flags = dict(AVX2=[], SSE2=[], NEON=[], SSE4=[])
+        self._simd_supported = dict(AVX2=False, SSE2=False, NEON=False, SSE4=False, SIMDE=False)
+        self._simd_defines = dict(AVX2=[], SSE2=[], NEON=[], SSE4=[], SIMDE=[])
+        self._simd_flags = dict(AVX2=[], SSE2=[], NEON=[], SSE4=[], SIMDE=[])
         self._simd_disabled = {
             "AVX2": self.disable_avx2,
             "SSE2": self.disable_sse2,
             "SSE4": self.disable_sse4,
             "NEON": self.disable_neon,
+            "SIMDE": self.disable_simde,
         }
         # transfer arguments to the build_clib method
         self._clib_cmd = self.get_finalized_command("build_clib")
@@ -167,14 +240,131 @@ class build_ext(_build_ext):
 
     # --- Autotools-like helpers ---
 
-    def _check_simd_generic(self, name, flags, header, vector, set, op, extract):
-        _eprint("checking whether compiler can build", name, "code", end="... ")
+    def _compiler_id(self):
+        command = getattr(self.compiler, "compiler", None) or []
+        # skip compiler launchers already configured by the user,
+        # e.g. with `CC="ccache gcc"`
+        executable = next((arg for arg in command if not _is_launcher(arg)), None)
+        if executable is None:
+            return None
+        try:
+            proc = subprocess.run(
+                [executable, "--version"],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                check=True,
+            )
+        except (OSError, subprocess.CalledProcessError):
+            return None
+        return [executable, proc.stdout.decode("utf-8", errors="replace")]
+
+    def _is_clang(self):
+        # on macOS `gcc` is an alias to `clang`, so the executable name
+        # cannot be used to detect the compiler family
+        return self._compiler_version is not None and "clang" in self._compiler_version[1]
+
+    def _load_probe_cache(self):
+        # compiler probes only depend on the compiler, so their results can
+        # be cached in the build folder and reused until the compiler changes
+        self._probe_cache = {}
+        self._probe_cache_lock = threading.Lock()
+        self._probe_cache_file = os.path.join(self.build_temp, "probes.json")
+        if self.force or self._compiler_version is None:
+            return
+        try:
+            with open(self._probe_cache_file) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("compiler") == self._compiler_version:
+            self._probe_cache = data.get("probes", {})
+
+    def _save_probe_cache(self):
+        if self._compiler_version is None:
+            return
+        self.mkpath(self.build_temp)
+        tmpfile = "{}.tmp".format(self._probe_cache_file)
+        with open(tmpfile, "w") as f:
+            json.dump(
+                {"compiler": self._compiler_version, "probes": self._probe_cache},
+                f,
+                indent=4,
+            )
+        os.replace(tmpfile, self._probe_cache_file)
+
+    def _load_cython_envs(self):
+        # record the compile-time environment used to generate each
+        # extension, since `cythonize` does not track it, together with
+        # the modification time of the generated sources, since these are
+        # shared between interpreters while `build_temp` is not
+        self._cython_envs_file = os.path.join(self.build_temp, "cython_envs.json")
+        try:
+            with open(self._cython_envs_file) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
 
+    def _save_cython_envs(self, envs):
+        self.mkpath(self.build_temp)
+        tmpfile = "{}.tmp".format(self._cython_envs_file)
+        with open(tmpfile, "w") as f:
+            json.dump(envs, f, indent=4)
+        os.replace(tmpfile, self._cython_envs_file)
+
+    def _generated_sources(self, ext):
+        suffix = ".cpp" if ext.language == "c++" else ".c"
+        generated = {}
+        for source in ext.sources:
+            base, source_suffix = os.path.splitext(source)
+            if source_suffix == ".pyx":
+                path = base + suffix
+                try:
+                    generated[path] = os.stat(path).st_mtime_ns
+                except OSError:
+                    generated[path] = None
+        return generated
+
+    def _cached_probe(self, key, probe, message, flags=(), cache=True):
+        cached = cache and key in self._probe_cache
+        if cached:
+            supported = self._probe_cache[key]
+        else:
+            supported = probe()
+            if cache:
+                with self._probe_cache_lock:
+                    self._probe_cache[key] = supported
+                    self._save_probe_cache()
+
+        if not supported:
+            result = "no"
+        elif not flags:
+            result = "yes"
+        else:
+            result = "yes, with {}".format(" ".join(flags))
+        if cached:
+            result += " (cached)"
+
+        # print the whole line at once since probes may run concurrently
+        _eprint(message, result)
+        return supported
+
+    def _check_simd_generic(self, name, flags, cache=True, **kwargs):
+        return self._cached_probe(
+            " ".join([name, *flags]),
+            functools.partial(self._probe_simd, name, flags, **kwargs),
+            "checking whether compiler can build {} code...".format(name),
+            flags=flags,
+            cache=cache,
+        )
+
+    def _probe_simd(self, name, flags, header, vector, set, op, extract):
         base = "have_{}".format(name)
         testfile = os.path.join(self.build_temp, "{}.c".format(base))
-        binfile = self.compiler.executable_filename(base, output_dir=self.build_temp)
         objects = []
 
+        # the test program is only compiled, not linked nor executed: the
+        # compiler rejects intrinsics that are not enabled by the flags, and
+        # runtime support is checked with `archspec` when the module is loaded
         self.mkpath(self.build_temp)
         with open(testfile, "w") as f:
             f.write(
@@ -183,7 +373,7 @@ class build_ext(_build_ext):
                 int main() {{
                     {}      a = {}(1);
                             a = {}(a);
-                    short   x = {}(a, 1);
+                    short   x = {};
                     return (x == 1) ? 0 : 1;
                 }}
             """.format(
@@ -194,30 +384,72 @@ class build_ext(_build_ext):
         try:
             self.mkpath(self.build_temp)
             objects = self.compiler.compile([testfile], extra_preargs=flags)
-            self.compiler.link_executable(objects, base, extra_preargs=flags, output_dir=self.build_temp)
-            subprocess.run([binfile], check=True)
         except CompileError:
-            _eprint("no")
             return False
-        except subprocess.CalledProcessError:
-            _eprint("yes, but cannot run code")
-            return True  # assume we are cross-compiling, and still build
         else:
-            if not flags:
-                _eprint("yes")
-            else:
-                _eprint("yes, with {}".format(" ".join(flags)))
             return True
         finally:
             os.remove(testfile)
             for obj in filter(os.path.isfile, objects):
                 os.remove(obj)
-            if os.path.isfile(binfile):
-                os.remove(binfile)
+
+    def _lto_flags(self):
+        return ["-flto=thin" if self._is_clang() else "-flto=auto"]
+
+    def _check_lto(self):
+        flags = self._lto_flags()
+        return self._cached_probe(
+            " ".join(["LTO", *flags]),
+            functools.partial(self._probe_lto, flags),
+            "checking whether compiler supports link-time optimization...",
+            flags=flags,
+        )
+
+    def _probe_lto(self, flags):
+        base = "have_lto"
+        testfile = os.path.join(self.build_temp, "{}.c".format(base))
+        libfile = self.compiler.shared_object_filename(base, output_dir=self.build_temp)
+        objects = []
+
+        # the test library must be linked as well, since LTO may need
+        # a linker plugin that the default linker does not provide
+        self.mkpath(self.build_temp)
+        with open(testfile, "w") as f:
+            f.write("int answer(void) { return 42; }\n")
+
+        try:
+            objects = self.compiler.compile([testfile], extra_preargs=flags)
+            self.compiler.link_shared_object(objects, libfile, extra_preargs=flags)
+        except (CompileError, LinkError):
+            return False
+        else:
+            return True
+        finally:
+            os.remove(testfile)
+            for obj in filter(os.path.isfile, objects):
+                os.remove(obj)
+            if os.path.isfile(libfile):
+                os.remove(libfile)
+
+    def _native_flags(self):
+        if TARGET_CPU == "x86":
+            # the host may support AVX-512, in which case prefer 256-bit
+            # vectors by default, since 512-bit instructions can lower the
+            # clock frequency of some Intel CPUs
+            return [
+                "-march=native",
+                "-mtune=native",
+                "-mprefer-vector-width={}".format(self.prefer_vector_width),
+            ]
+        elif TARGET_CPU in {"arm", "aarch64", "ppc"}:
+            return ["-mcpu=native"]
+        return []
 
     def _avx2_flags(self):
         if self.compiler.compiler_type == "msvc":
             return ["/arch:AVX2"]
+        if self.march_native:
+            return self._native_flags()
         return ["-mavx", "-mavx2"]
 
     def _check_avx2(self):
@@ -228,12 +460,14 @@ class build_ext(_build_ext):
             vector="__m256i",
             set="_mm256_set1_epi16",
             op="_mm256_abs_epi32",
-            extract="_mm256_extract_epi16",
+            extract="_mm256_extract_epi16(a, 1)",
         )
 
     def _sse2_flags(self):
         if self.compiler.compiler_type == "msvc":
             return []
+        if self.march_native:
+            return self._native_flags()
         return ["-msse2"]
 
     def _check_sse2(self):
@@ -244,12 +478,14 @@ class build_ext(_build_ext):
             vector="__m128i",
             set="_mm_set1_epi16",
             op="_mm_move_epi64",
-            extract="_mm_extract_epi16",
+            extract="_mm_extract_epi16(a, 1)",
         )
 
     def _sse4_flags(self):
         if self.compiler.compiler_type == "msvc":
             return ["/arch:AVX"]
+        if self.march_native:
+            return self._native_flags()
         return ["-msse4.1"]
 
     def _check_sse4(self):
@@ -260,11 +496,16 @@ class build_ext(_build_ext):
             vector="__m128i",
             set="_mm_set1_epi8",
             op="_mm_cvtepi8_epi16",
-            extract="_mm_extract_epi16",
+            extract="_mm_extract_epi16(a, 1)",
         )
 
     def _neon_flags(self):
-        return ["-mfpu=neon"] if TARGET_CPU == "arm" else []
+        # `-mcpu=native` does not enable NEON on ARMv7 unless the default
+        # FPU of the compiler already does, so `-mfpu=neon` is always kept
+        flags = self._native_flags() if self.march_native else []
+        if TARGET_CPU == "arm":
+            flags.append("-mfpu=neon")
+        return flags
 
     def _check_neon(self):
         return self._check_simd_generic(
@@ -274,12 +515,46 @@ class build_ext(_build_ext):
             vector="int16x8_t",
             set="vdupq_n_s16",
             op="vabsq_s16",
-            extract="vgetq_lane_s16",
+            extract="vgetq_lane_s16(a, 1)",
+        )
+
+    def _simde_flags(self):
+        if self.compiler.compiler_type == "msvc":
+            return []
+        if self.march_native:
+            return self._native_flags()
+        return ["-fopenmp-simd"]
+
+    def _check_simde(self):
+        # not cached, since the result depends on whether the SIMDe headers
+        # are installed rather than only on the compiler
+        return self._check_simd_generic(
+            "SIMDE",
+            self._simde_flags(),
+            cache=False,
+            header="simde/x86/sse2.h",
+            vector="simde__m128i",
+            set="simde_mm_set1_epi16",
+            op="simde_mm_move_epi64",
+            extract="simde_mm_extract_epi16(a, 1)",
         )
 
     def _check_getid(self):
-        _eprint('checking whether `PyInterpreterState_GetID` is available')
+        # the result depends on the Python headers rather than the compiler,
+        # and `build_temp` may be shared between interpreters of the same
+        # version (e.g. CPython and PyPy) with older setuptools
+        key = " ".join([
+            "PyInterpreterState_GetID",
+            sys.implementation.cache_tag or sys.implementation.name,
+            sysconfig.get_paths()["include"],
+        ])
+        return self._cached_probe(
+            key,
+            self._probe_getid,
+            "checking whether `PyInterpreterState_GetID` is available...",
+        )
 
+    def _probe_getid(self):
         base = "have_getid"
         testfile = os.path.join(self.build_temp, "{}.c".format(base))
         objects = []
@@ -306,16 +581,35 @@ class build_ext(_build_ext):
             self.mkpath(self.build_temp)
             objects = self.compiler.compile([testfile], extra_postargs=flags)
         except CompileError:
-            _eprint("no")
             return False
         else:
-            _eprint("yes")
             return True
         finally:
             os.remove(testfile)
             for obj in filter(os.path.isfile, objects):
                 os.remove(obj)
 
+    def _enable_ccache(self):
+        if self.compiler.compiler_type not in {"unix", "cygwin", "mingw32"}:
+            return
+        ccache = shutil.which("sccache") or shutil.which("ccache")
+        if ccache is None:
+            return
+        # only wrap compilation commands: `compiler_cxx` is also used
+        # by `distutils` to replace the linker executable for C++ code
+        commands = [
+            getattr(self.compiler, tool, None)
+            for tool in ("compiler", "compiler_so", "compiler_so_cxx")
+        ]
+        commands = [cmd for cmd in commands if cmd and not _is_launcher(cmd[0])]
+        if not commands:
+            return
+        _eprint("using", ccache, "for C/C++ compilation")
+        if os.path.splitext(os.path.basename(ccache))[0] == "ccache":
+            os.environ.setdefault("CCACHE_CPP2", "1")
+        for command in commands:
+            command.insert(0, ccache)
+
     # --- Build code ---
 
     def build_extension(self, ext):
@@ -345,6 +639,69 @@ class build_ext(_build_ext):
         elif self.compiler.compiler_type == "msvc":
             ext.extra_compile_args.append("/std:c17")
 
+        # use pipes rather than temporary files between compilation stages
+        if self.compiler.compiler_type in {"unix", "cygwin", "mingw32"}:
+            ext.extra_compile_args.append("-pipe")
+
+        # tune for the host CPU if requested (SIMD extensions received the
+        # native flags from `_simd_flags` instead of their instruction set
+        # flags, so only extensions without SIMD requirements need them)
+        if self.march_native:
+            if self.compiler.compiler_type in {"unix", "cygwin", "mingw32"}:
+                if ext.requires is None:
+                    ext.extra_compile_args.extend(self._native_flags())
+            elif self.compiler.compiler_type == "msvc":
+                if TARGET_CPU == "x86" and sys.maxsize > 2**32:
+                    ext.extra_compile_args.append("/favor:INTEL64")
+
+        # relax floating-point semantics that are never relied upon, without
+        # changing computed values (`identity` and `coverage` are tested with
+        # exact equality, so the value-changing `-ffast-math` subset is unused)
+        if not self.debug and self.compiler.compiler_type in {"unix", "cygwin", "mingw32"}:
+            ext.extra_compile_args.extend(["-fno-math-errno", "-fno-trapping-math"])
+
+        # enable link-time optimization and reduce symbol visibility
+        # in release mode
+        if not self.debug:
+            if self.compiler.compiler_type in {"unix", "cygwin", "mingw32"}:
+                flags = self._lto_flags() if self._lto else []
+                # `PyMODINIT_FUNC` only exports the module init function
+                # explicitly since Python 3.9
+                if sys.implementation.name == "cpython" and sys.version_info >= (3, 9):
+                    flags.extend(["-fvisibility=hidden", "-fvisibility-inlines-hidden"])
+                if TARGET_SYSTEM == "linux_or_android":
+                    flags.extend(["-fno-plt", "-fno-semantic-interposition"])
+                ext.extra_compile_args.extend(flags)
+                ext.extra_link_args.extend(flags)
+            elif self.compiler.compiler_type == "msvc" and self._lto:
+                ext.extra_compile_args.append("/GL")
+                ext.extra_link_args.append("/LTCG")
+
+        # add profile-guided optimization flags
+        if self.pgo_generate or self.pgo_use:
+            if self.pgo_generate:
+                profile_dir = os.path.abspath(os.path.join(self.build_temp, "pgo"))
+            else:
+                profile_dir = self.pgo_use
+            if self.compiler.compiler_type in {"unix", "cygwin", "mingw32"}:
+                if self.pgo_generate:
+                    flags = ["-fprofile-generate={}".format(profile_dir)]
+                elif self._is_clang():
+                    flags = ["-fprofile-use={}".format(profile_dir), "-Wno-profile-instr-missing"]
+                else:
+                    flags = ["-fprofile-use={}".format(profile_dir), "-Wno-missing-profile"]
+                if not self._is_clang():
+                    flags.append("-fprofile-correction")
+                ext.extra_compile_args.extend(flags)
+                ext.extra_link_args.extend(flags)
+            elif self.compiler.compiler_type == "msvc":
+                pgd = os.path.join(profile_dir, "{}.pgd".format(ext.name))
+                if self.pgo_generate:
+                    self.mkpath(profile_dir)
+                    ext.extra_link_args.append("/GENPROFILE:PGD={}".format(pgd))
+                else:
+                    ext.extra_link_args.append("/USEPROFILE:PGD={}".format(pgd))
+
         # add Windows flags
         if self.compiler.compiler_type == "msvc":
             ext.define_macros.append(("WIN32", 1))
@@ -359,7 +716,7 @@ class build_ext(_build_ext):
             ext.extra_objects.append(libfile)
 
         # check if `PyInterpreterState_GetID` is defined
-        if self._check_getid():
+        if self._have_getid:
             ext.define_macros.append(("HAS_PYINTERPRETERSTATE_GETID", 1))
 
         # build the rest of the extension as normal
@@ -368,11 +725,11 @@ class build_ext(_build_ext):
         # compile extension in its own folder: since we need to compile
         # `opal.cpp` several times with different flags, we cannot use the
         # default build folder, otherwise the built object would be cached
-        # and prevent recompilation
-        _build_temp = self.build_temp
-        self.build_temp = os.path.join(_build_temp, ext.name)
-        _build_ext.build_extension(self, ext)
-        self.build_temp = _build_temp
+        # and prevent recompilation; the folder is set on a shallow copy of
+        # the command so that extensions can be built concurrently
+        cmd = copy.copy(self)
+        cmd.build_temp = os.path.join(self.build_temp, ext.name)
+        _build_ext.build_extension(cmd, ext)
 
     def build_extensions(self):
         # check `cythonize` is available
@@ -385,6 +742,18 @@ class build_ext(_build_ext):
         if platform.system() == "Darwin":
             _patch_osx_compiler(self.compiler)
 
+        # record the compiler identity before it is wrapped by a cache
+        self._compiler_version = self._compiler_id()
+
+        # use a compiler cache if one is available
+        if os.environ.get("PYOPAL_NO_CCACHE") != "1":
+            self._enable_ccache()
+
+        # initialize MSVC eagerly, since the compiler is then used from
+        # several threads and its lazy initialization is not thread-safe
+        if self.compiler.compiler_type == "msvc" and not self.compiler.initialized:
+            self.compiler.initialize()
+
         # use debug directives with Cython if building in debug mode
         cython_args = {
             "include_path": ["include"],
@@ -400,10 +769,6 @@ class build_ext(_build_ext):
                 "DEFAULT_BUFFER_SIZE": io.DEFAULT_BUFFER_SIZE,
                 "TARGET_CPU": TARGET_CPU,
                 "TARGET_SYSTEM": TARGET_SYSTEM,
-                "AVX2_BUILD_SUPPORT": False,
-                "NEON_BUILD_SUPPORT": False,
-                "SSE2_BUILD_SUPPORT": False,
-                "SSE4_BUILD_SUPPORT": False,
             },
         }
         if self.force:
@@ -431,28 +796,44 @@ class build_ext(_build_ext):
             ext.include_dirs.append(self._clib_cmd.build_clib)
 
         # check if we can build platform-specific code
-        if TARGET_CPU == "x86":
-            if not self._simd_disabled["AVX2"] and self._check_avx2():
-                cython_args["compile_time_env"]["AVX2_BUILD_SUPPORT"] = True
-                self._simd_supported["AVX2"] = True
-                self._simd_flags["AVX2"].extend(self._avx2_flags())
-                self._simd_defines["AVX2"].append(("__AVX2__", 1))
-            if not self._simd_disabled["SSE4"] and self._check_sse4():
-                cython_args["compile_time_env"]["SSE4_BUILD_SUPPORT"] = True
-                self._simd_supported["SSE4"] = True
-                self._simd_flags["SSE4"].extend(self._sse4_flags())
-                self._simd_defines["SSE4"].append(("__SSE4_1__", 1))
-            if not self._simd_disabled["SSE2"] and self._check_sse2():
-                cython_args["compile_time_env"]["SSE2_BUILD_SUPPORT"] = True
-                self._simd_supported["SSE2"] = True
-                self._simd_flags["SSE2"].extend(self._sse2_flags())
-                self._simd_defines["SSE2"].append(("__SSE2__", 1))
-        elif TARGET_CPU == "arm" or TARGET_CPU == "aarch64":
-            if not self._simd_disabled["NEON"] and self._check_neon():
-                cython_args["compile_time_env"]["NEON_BUILD_SUPPORT"] = True
-                self._simd_supported["NEON"] = True
-                self._simd_flags["NEON"].extend(self._neon_flags())
-                self._simd_defines["NEON"].append(("__ARM_NEON__", 1))
+        self._load_probe_cache()
+        simd_macros = {name: macro for name, macro, _ in _SIMD_VARIANTS.values()}
+        candidates = [
+            name
+            for name, _, cpus in _SIMD_VARIANTS.values()
+            if TARGET_CPU in cpus and not self._simd_disabled[name]
+        ]
+
+        # run the probes concurrently: each of them is a compiler invocation
+        # writing to its own `have_<name>.c` file, so they do not collide
+        if candidates:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=len(candidates)) as pool:
+                futures = {
+                    name: pool.submit(getattr(self, "_check_{}".format(name.lower())))
+                    for name in candidates
+                }
+            for name, future in futures.items():
+                if future.result():
+                    self._simd_supported[name] = True
+                    self._simd_flags[name].extend(getattr(self, "_{}_flags".format(name.lower()))())
+                    self._simd_defines[name].append((simd_macros[name], 1))
+
+        # check if link-time optimization can be used in release mode
+        if self.debug or self.disable_lto:
+            self._lto = False
+        elif self.compiler.compiler_type in {"unix", "cygwin", "mingw32"}:
+            self._lto = self._check_lto()
+        else:
+            self._lto = self.compiler.compiler_type == "msvc"
+
+        # use SIMDe to emulate SSE2 if no native SIMD backend is available
+        if not any(self._simd_supported.values()):
+            if not self._simd_disabled["SIMDE"] and self._check_simde():
+                self._simd_supported["SIMDE"] = True
+                self._simd_flags["SIMDE"].extend(self._simde_flags())
+                self._simd_defines["SIMDE"].append(("__SSE2__", 1))
+            else:
+                raise RuntimeError("Cannot build Opal for platform {}, no SIMD backend supported".format(MACHINE))
 
         # filter out extensions missing required CPU features
         extensions = []
@@ -463,13 +844,42 @@ class build_ext(_build_ext):
                 ext.extra_compile_args.extend(self._simd_flags[ext.requires])
                 ext.extra_link_args.extend(self._simd_flags[ext.requires])
                 extensions.append(ext)
-        if not extensions:
-            raise RuntimeError("Cannot build Opal for platform {}, no SIMD backend supported".format(MACHINE))
-
-        # cythonize the extensions (retaining platform-specific sources)
-        self.extensions = cythonize(extensions, **cython_args)
 
-        # build the extensions as normal
+        # cythonize the extensions (retaining platform-specific sources);
+        # SIMD extensions only get their own `*_BUILD_SUPPORT` constant, so
+        # that they are not regenerated when other SIMD backends change
+        cython_envs = self._load_cython_envs()
+        self.extensions = []
+        for ext in extensions:
+            if ext.requires is None:
+                simd_env = {
+                    "{}_BUILD_SUPPORT".format(name): supported
+                    for name, supported in self._simd_supported.items()
+                }
+            else:
+                simd_env = {"{}_BUILD_SUPPORT".format(ext.requires): True}
+            compile_time_env = dict(cython_args["compile_time_env"], **simd_env)
+            # `cythonize` only regenerates code for sources newer than the
+            # generated file, so force it if the environment has changed or
+            # if the generated file was regenerated by another interpreter
+            record = {"env": compile_time_env, "sources": self._generated_sources(ext)}
+            force = cython_args.get("force", False) or cython_envs.get(ext.name) != record
+            options = dict(cython_args, compile_time_env=compile_time_env, force=force)
+            # `cythonize` creates new extension objects without the
+            # `requires` attribute, so it must be carried over manually
+            for cythonized in cythonize([ext], **options):
+                cythonized.requires = ext.requires
+                self.extensions.append(cythonized)
+            record["sources"] = self._generated_sources(ext)
+            cython_envs[ext.name] = record
+        self._save_cython_envs(cython_envs)
+
+        # check if `PyInterpreterState_GetID` is defined (only once, since
+        # the probe file cannot be shared between concurrent builds)
+        self._have_getid = self._check_getid()
+
+        # build the extensions as normal (concurrently with `--parallel`,
+        # which `build_extension` supports by not mutating the command)
         _build_ext.build_extensions(self)
 
 
@@ -496,69 +906,42 @@ class clean(_clean):
 
 setuptools.setup(
     ext_modules=[
-        Extension(
-            "pyopal._opal_neon",
-            language="c++",
-            requires="NEON",
-            define_macros=[
-                ("__ARM_NEON", 1),
-            ],
-            sources=[
-                os.path.join("vendor", "opal", "src", "opal.cpp"),
-                os.path.join("pyopal", "_opal_neon.pyx"),
-            ],
-            include_dirs=[
-                os.path.join("vendor", "opal", "src"),
-                "pyopal",
-                "include",
-            ],
+        *(
+            Extension(
+                "pyopal._opal_{}".format(suffix),
+                language="c++",
+                requires=name,
+                define_macros=[
+                    (macro, 1),
+                ],
+                sources=[
+                    os.path.join("vendor", "opal", "src", "opal.cpp"),
+                    os.path.join("pyopal", "_opal_{}.pyx".format(suffix)),
+                ],
+                include_dirs=[
+                    os.path.join("vendor", "opal", "src"),
+                    "pyopal",
+                    "include",
+                ],
+            )
+            for suffix, (name, macro, cpus) in _SIMD_VARIANTS.items()
+            if TARGET_CPU in cpus
         ),
         Extension(
-            "pyopal._opal_sse2",
+            "pyopal._opal_simde",
             language="c++",
-            requires="SSE2",
+            requires="SIMDE",
             define_macros=[
                 ("__SSE2__", 1),
+                ("SIMDE_ENABLE_NATIVE_ALIASES", 1),
+                ("SIMDE_X86_SSE2_NO_NATIVE", 1),
             ],
             sources=[
                 os.path.join("vendor", "opal", "src", "opal.cpp"),
-                os.path.join("pyopal", "_opal_sse2.pyx"),
-            ],
-            include_dirs=[
-                os.path.join("vendor", "opal", "src"),
-                "pyopal",
-                "include",
-            ],
-        ),
-        Extension(
-            "pyopal._opal_sse4",
-            language="c++",
-            requires="SSE4",
-            define_macros=[
-                ("__SSE4_1__", 1),
-            ],
-            sources=[
-                os.path.join("vendor", "opal", "src", "opal.cpp"),
-                os.path.join("pyopal", "_opal_sse4.pyx"),
-            ],
-            include_dirs=[
-                os.path.join("vendor", "opal", "src"),
-                "pyopal",
-                "include",
-            ],
-        ),
-        Extension(
-            "pyopal._opal_avx2",
-            language="c++",
-            requires="AVX2",
-            define_macros=[
-                ("__AVX2__", 1),
-            ],
-            sources=[
-                os.path.join("vendor", "opal", "src", "opal.cpp"),
-                os.path.join("pyopal", "_opal_avx2.pyx"),
+                os.path.join("pyopal", "_opal_simde.pyx"),
             ],
             include_dirs=[
+                os.path.join("include", "simde-shims"),
                 os.path.join("vendor", "opal", "src"),
                 "pyopal",
                 "include",